@@ -3,14 +3,18 @@
 # SPDX-License-Identifier: MPL-2.0
 import logging
 from contextlib import ExitStack
+from math import isfinite
 from pathlib import Path
+from random import uniform
 from time import sleep
 from types import TracebackType
 from typing import Optional
+from typing import Union
 
 from httpx import Client
 from httpx import HTTPStatusError
 from httpx import Response
+from httpx import codes
 from httpx._types import RequestFiles
 
 from gotenberg_client._errors import MaxRetriesExceededError
@@ -53,7 +57,7 @@ class PfdUniversalAccessMixin:
         return self
 
     def disable_universal_access(self) -> Self:
-        self._form_data.update({"pdfua": "true"})  # type: ignore[attr-defined,misc]
+        self._form_data.update({"pdfua": "false"})  # type: ignore[attr-defined,misc]
         return self
 
 
@@ -72,7 +76,7 @@ class _BaseRoute(PdfFormatMixin, PfdUniversalAccessMixin):
         # These are the names of files, mapping to their Path
         self._file_map: dict[str, Path] = {}
         # Additional in memory resources, mapping the referenced name to the content and an optional mimetype
-        self._in_memory_resources: dict[str, tuple[str, Optional[str]]] = {}
+        self._in_memory_resources: dict[str, tuple[Union[str, bytes], Optional[str]]] = {}
         # Any header that will also be sent
         self._headers: dict[str, str] = {}
 
@@ -124,10 +128,13 @@ class _BaseRoute(PdfFormatMixin, PfdUniversalAccessMixin):
         max_retry_count: int = 5,
         initial_retry_wait: WaitTimeType = 5.0,
         retry_scale: WaitTimeType = 2.0,
+        max_retry_wait: Optional[WaitTimeType] = None,
+        jitter: bool = False,
     ) -> Response:
         """
         For whatever reason, Gotenberg often returns HTTP 503 errors, even with the same files.
         Hopefully v8 will improve upon this with its updates, but this is provided for convenience.
+        A 429 response, such as from a rate limiting proxy, is retried the same way.
 
         This function will retry the given method/function up to X times, with larger backoff
         periods between each attempt, in hopes the issue resolves itself during
@@ -140,37 +147,74 @@ class _BaseRoute(PdfFormatMixin, PfdUniversalAccessMixin):
             - Attempt 4 - 40s following failure
             - Attempt 5 - 80s following failure
 
+        With jitter, each backoff wait is instead a random duration between zero and that
+        wait, so many clients retrying at once do not all hit the server again together.
+
+        If the server responds with a Retry-After header, that wait is used for
+        the attempt instead, though by default it is no longer than the backoff wait
+        it replaces, so the total wait stays bounded.
+
+        If max_retry_wait is given, no wait is longer than it, and a Retry-After
+        header may ask for any wait up to it instead of up to the backoff wait.
         """
         retry_time = initial_retry_wait
         current_retry_count = 0
 
         while current_retry_count < max_retry_count:
             current_retry_count = current_retry_count + 1
+            server_wait: Optional[float] = None
 
             try:
                 return self._base_run()
             except HTTPStatusError as e:
-                logger.warning(f"HTTP error: {e}", stacklevel=1)
+                logger.warning("HTTP error: %s", e, stacklevel=1)
 
-                # This only handles status codes which are 5xx, indicating the server had a problem
-                # Not 4xx, with probably means a problem with the request
-                if not e.response.is_server_error:
+                # This only handles status codes which are 5xx, indicating the server had a problem,
+                # or 429, asking to try again later.  Not other 4xx, which probably means a problem with the request
+                if not (e.response.is_server_error or e.response.status_code == codes.TOO_MANY_REQUESTS):
                     raise
 
                 # Don't do the extra waiting, return right away
                 if current_retry_count >= max_retry_count:
                     raise MaxRetriesExceededError(response=e.response) from e
 
+                server_wait = self._retry_after(e.response)
+
             except Exception as e:  # pragma: no cover
-                logger.warning(f"Unexpected error: {e}", stacklevel=1)
+                logger.warning("Unexpected error: %s", e, stacklevel=1)
                 if current_retry_count > -max_retry_count:
                     raise
 
-            sleep(retry_time)
+            if server_wait is None:
+                wait = retry_time if max_retry_wait is None else min(retry_time, max_retry_wait)
+                if jitter:
+                    wait = uniform(0, wait)  # noqa: S311
+            else:
+                # Without a caller chosen limit, the server can not ask for more than the backoff wait
+                wait = min(server_wait, retry_time if max_retry_wait is None else max_retry_wait)
+            sleep(wait)
             retry_time = retry_time * retry_scale
 
         raise UnreachableCodeError  # pragma: no cover
 
+    @staticmethod
+    def _retry_after(response: Response) -> Optional[float]:
+        """
+        Returns the number of seconds the server asked to wait before retrying, if it
+        provided a Retry-After header in seconds.  HTTP date values, and values which
+        are not a finite number, such as nan or inf, are ignored.
+        """
+        if "Retry-After" not in response.headers:
+            return None
+        value: str = response.headers["Retry-After"]
+        try:
+            seconds = float(value)
+        except ValueError:
+            return None
+        if not isfinite(seconds):
+            return None
+        return max(seconds, 0.0)
+
     def _get_all_resources(self) -> RequestFiles:
         """
         Deals with opening all provided files for multi-part uploads, including
@@ -213,7 +257,7 @@ class _BaseRoute(PdfFormatMixin, PfdUniversalAccessMixin):
 
         self._file_map[name] = filepath
 
-    def _add_in_memory_file(self, data: str, *, name: str, mime_type: Optional[str] = None) -> None:
+    def _add_in_memory_file(self, data: Union[str, bytes], *, name: str, mime_type: Optional[str] = None) -> None:
         if name in self._in_memory_resources:  # pragma: no cover
             logger.warning(f"{name} has already been provided, overwriting anyway")
 
@@ -254,6 +298,8 @@ class BaseSingleFileResponseRoute(_BaseRoute):
         max_retry_count: int = 5,
         initial_retry_wait: WaitTimeType = 5,
         retry_scale: WaitTimeType = 2,
+        max_retry_wait: Optional[WaitTimeType] = None,
+        jitter: bool = False,
     ) -> SingleFileResponse:
         """
         Execute the API request with a retry mechanism.
@@ -267,6 +313,12 @@ class BaseSingleFileResponseRoute(_BaseRoute):
                 Defaults to 5. Can be int or float.
             retry_scale (WaitTimeType, optional): The scale factor for the exponential backoff.
                 Defaults to 2. Can be int or float.
+            max_retry_wait (WaitTimeType, optional): The longest wait between retries in seconds,
+                including one requested by a Retry-After header. Defaults to None, limiting a
+                Retry-After to the backoff wait.
+                Can be int or float.
+            jitter (bool, optional): Whether to wait a random duration up to the backoff wait, spreading
+                out retries from many clients. Defaults to False.
 
         Returns:
             SingleFileResponse: The response object containing the result of the API call.
@@ -278,6 +330,8 @@ class BaseSingleFileResponseRoute(_BaseRoute):
             max_retry_count=max_retry_count,
             initial_retry_wait=initial_retry_wait,
             retry_scale=retry_scale,
+            max_retry_wait=max_retry_wait,
+            jitter=jitter,
         )
 
         return SingleFileResponse(response.status_code, response.headers, response.content)
@@ -306,6 +360,8 @@ class BaseZipFileResponseRoute(_BaseRoute):
         max_retry_count: int = 5,
         initial_retry_wait: WaitTimeType = 5,
         retry_scale: WaitTimeType = 2,
+        max_retry_wait: Optional[WaitTimeType] = None,
+        jitter: bool = False,
     ) -> ZipFileResponse:
         """
         Execute the API request with a retry mechanism.
@@ -319,6 +375,12 @@ class BaseZipFileResponseRoute(_BaseRoute):
                 Defaults to 5. Can be int or float.
             retry_scale (WaitTimeType, optional): The scale factor for the exponential backoff.
                 Defaults to 2. Can be int or float.
+            max_retry_wait (WaitTimeType, optional): The longest wait between retries in seconds,
+                including one requested by a Retry-After header. Defaults to None, limiting a
+                Retry-After to the backoff wait.
+                Can be int or float.
+            jitter (bool, optional): Whether to wait a random duration up to the backoff wait, spreading
+                out retries from many clients. Defaults to False.
 
         Returns:
             ZipFileResponse: The zipped response with the files
@@ -330,6 +392,8 @@ class BaseZipFileResponseRoute(_BaseRoute):
             max_retry_count=max_retry_count,
             initial_retry_wait=initial_retry_wait,
             retry_scale=retry_scale,
+            max_retry_wait=max_retry_wait,
+            jitter=jitter,
         )
 
         return ZipFileResponse(response.status_code, response.headers, response.content)
@@ -81,6 +81,25 @@ class _RouteWithResources(BaseSingleFileResponseRoute):
         self._add_in_memory_file(resource, name=name, mime_type=mime_type)
         return self
 
+    def bytes_resource(self, resource: bytes, name: str, mime_type: Optional[str] = None) -> Self:
+        """
+        Adds a binary resource, such as an image or font, to the conversion process.
+
+        The provided bytes will be made available to the index HTML file during conversion,
+        using the specified name and MIME type, without needing to exist on disk.
+
+        Args:
+            resource (bytes): The binary data to be added as a resource.
+            name (str): The name to assign to the resource.
+            mime_type (Optional[str]): The MIME type of the resource (optional).
+
+        Returns:
+            Self: This object itself for method chaining.
+        """
+
+        self._add_in_memory_file(resource, name=name, mime_type=mime_type)
+        return self
+
     def resources(self, resources: list[Path]) -> Self:
         """
         Adds multiple resource files for the index HTML file to reference.
@@ -233,7 +233,7 @@ class PerformanceModeMixin:
     """
 
     def skip_network_idle(self) -> Self:
-        self._form_data.update({"skipNetworkIdleEvent": "false"})  # type: ignore[attr-defined,misc]
+        self._form_data.update({"skipNetworkIdleEvent": "true"})  # type: ignore[attr-defined,misc]
         return self
 
     def use_network_idle(self) -> Self:
@@ -341,11 +341,6 @@ class MetadataMixin:
             if any("," in k for k in keywords):
                 raise InvalidKeywordError("Keywords cannot contain commas")  # noqa: EM101, TRY003
 
-        # Get existing metadata if any
-        existing_metadata: dict[str, Union[str, bool, float]] = {}
-        if "metadata" in self._form_data:  # type: ignore[attr-defined,misc]
-            existing_metadata = json.loads(self._form_data["metadata"])  # type: ignore[attr-defined,misc]
-
         # Convert validated metadata to dictionary
         metadata: dict[str, Union[str, bool, float]] = {}
 
@@ -374,8 +369,11 @@ class MetadataMixin:
         if trapped is not None:
             metadata["Trapped"] = trapped.value
 
-        # Merge existing and new metadata
+        # Merge existing and new metadata, only decoding the existing metadata when something changed
         if metadata:
+            existing_metadata: dict[str, Union[str, bool, float]] = {}
+            if "metadata" in self._form_data:  # type: ignore[attr-defined,misc]
+                existing_metadata = json.loads(self._form_data["metadata"])  # type: ignore[attr-defined,misc]
             self._form_data.update({"metadata": json.dumps({**existing_metadata, **metadata})})  # type: ignore[attr-defined,misc]
 
         return self
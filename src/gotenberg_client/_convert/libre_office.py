@@ -2,6 +2,7 @@
 #
 # SPDX-License-Identifier: MPL-2.0
 from pathlib import Path
+from typing import Optional
 from typing import Union
 
 from httpx import Client
@@ -48,10 +49,36 @@ class LibreOfficeConvertRoute(PageOrientMixin, PageRangeMixin, MetadataMixin, Ba
         """
 
         self._add_file_map(input_file_path)
+        self._count_conversion()
+        return self
+
+    def convert_bytes(self, data: bytes, name: str, mime_type: Optional[str] = None) -> Self:
+        """
+        Adds a single in-memory document to be converted to PDF.
+
+        The document does not need to exist on disk.  Calling this method, or convert,
+        multiple times will result in a ZIP containing individual PDFs for each file.
+
+        Args:
+            data (bytes): The content of the document to be converted.
+            name (str): The file name of the document, including its extension.
+            mime_type (Optional[str]): The MIME type of the document (optional).
+
+        Returns:
+            LibreOfficeConvertRoute: This object itself for method chaining.
+        """
+
+        self._add_in_memory_file(data, name=name, mime_type=mime_type)
+        self._count_conversion()
+        return self
+
+    def _count_conversion(self) -> None:
+        """
+        Tracks each document added for conversion, as more than one results in a ZIP
+        """
         self._convert_calls += 1
         if self._convert_calls > 1:
             self._result_is_zip = True
-        return self
 
     def convert_files(self, file_paths: list[Path]) -> Self:
         """
@@ -102,7 +129,7 @@ class LibreOfficeConvertRoute(PageOrientMixin, PageRangeMixin, MetadataMixin, Ba
     def run(self) -> Union[SingleFileResponse, ZipFileResponse]:  # type: ignore[override]
         resp = super().run()
 
-        if self._result_is_zip:  # pragma: no cover
+        if self._result_is_zip:
             return ZipFileResponse(resp.status_code, resp.headers, resp.content)
         return resp
 
@@ -112,11 +139,15 @@ class LibreOfficeConvertRoute(PageOrientMixin, PageRangeMixin, MetadataMixin, Ba
         max_retry_count: int = 5,
         initial_retry_wait: WaitTimeType = 5,
         retry_scale: WaitTimeType = 2,
+        max_retry_wait: Optional[WaitTimeType] = None,
+        jitter: bool = False,
     ) -> Union[SingleFileResponse, ZipFileResponse]:
         resp = super().run_with_retry(
             max_retry_count=max_retry_count,
             initial_retry_wait=initial_retry_wait,
             retry_scale=retry_scale,
+            max_retry_wait=max_retry_wait,
+            jitter=jitter,
         )
 
         if self._result_is_zip:
@@ -3,21 +3,42 @@
 # SPDX-License-Identifier: MPL-2.0
 import logging
 import os
-import shutil
 from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Union
 
 import httpx
 import pytest
 
 from gotenberg_client import GotenbergClient
-from gotenberg_client import SingleFileResponse
-from gotenberg_client import ZipFileResponse
+from gotenberg_client._convert.libre_office import LibreOfficeConvertRoute
 
 logger = logging.getLogger("gotenberg-client.tests")
 
 
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--mocked-only",
+        action="store_true",
+        default=False,
+        help="Skip the integration tests, which need the Gotenberg and webserver containers",
+    )
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    """
+    Marks any test which needs the Gotenberg container as an integration test,
+    allowing the mocked tests to be run alone with -m "not integration" or --mocked-only
+    """
+    skip_integration = pytest.mark.skip(reason="--mocked-only was given")
+    mocked_only = config.getoption("--mocked-only")
+    for item in items:
+        if "gotenberg_host" in getattr(item, "fixturenames", ()):
+            item.add_marker(pytest.mark.integration)
+            if mocked_only:
+                item.add_marker(skip_integration)
+
+
 def is_responsive(url):
     try:
         response = httpx.get(url)
@@ -60,8 +81,27 @@ def webserver_docker_internal_url(webserver_service_name: str) -> str:
     return f"http://{webserver_service_name}"
 
 
+def warm_up_chromium(url: str, index: Path) -> None:
+    """
+    The first conversions pay for Chromium starting up inside Gotenberg, so issue a few
+    small ones concurrently before any test runs, keeping that out of the first test's timing
+    """
+    count = int(os.environ.get("GOTENBERG_CLIENT_WARMUP_COUNT", "4"))
+    if count < 1:
+        return
+
+    with GotenbergClient(host=url) as client:
+
+        def _convert(_: int) -> None:
+            with client.chromium.html_to_pdf() as route:
+                route.index(index).run_with_retry()
+
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            list(executor.map(_convert, range(count)))
+
+
 @pytest.fixture(scope="session")
-def gotenberg_host(docker_services, docker_ip: str, gotenberg_service_name: str) -> str:
+def gotenberg_host(docker_services, docker_ip: str, gotenberg_service_name: str, basic_html_file: Path) -> str:
     url = f"http://{docker_ip}:{docker_services.port_for(gotenberg_service_name, 3000)}"
 
     docker_services.wait_until_responsive(
@@ -69,6 +109,7 @@ def gotenberg_host(docker_services, docker_ip: str, gotenberg_service_name: str)
         pause=1,
         check=lambda: is_responsive(f"{url}/version"),
     )
+    warm_up_chromium(url, basic_html_file)
     return url
 
 
@@ -124,6 +165,21 @@ def css_style_file(sample_directory: Path) -> Path:
     return sample_directory / "style.css"
 
 
+@pytest.fixture(scope="session")
+def img_gif_bytes(img_gif_file: Path) -> bytes:
+    return img_gif_file.read_bytes()
+
+
+@pytest.fixture(scope="session")
+def font_bytes(font_file: Path) -> bytes:
+    return font_file.read_bytes()
+
+
+@pytest.fixture(scope="session")
+def css_style_bytes(css_style_file: Path) -> bytes:
+    return css_style_file.read_bytes()
+
+
 @pytest.fixture(scope="session")
 def markdown_index_file(sample_directory: Path) -> Path:
     return sample_directory / "markdown_index.html"
@@ -139,11 +195,26 @@ def markdown_sample_two_file(sample_directory: Path) -> Path:
     return sample_directory / "markdown2.md"
 
 
+@pytest.fixture(scope="session")
+def markdown_sample_one_text(markdown_sample_one_file: Path) -> str:
+    return markdown_sample_one_file.read_text()
+
+
+@pytest.fixture(scope="session")
+def markdown_sample_two_text(markdown_sample_two_file: Path) -> str:
+    return markdown_sample_two_file.read_text()
+
+
 @pytest.fixture(scope="session")
 def docx_sample_file(sample_directory: Path) -> Path:
     return sample_directory / "sample.docx"
 
 
+@pytest.fixture(scope="session")
+def docx_sample_bytes(docx_sample_file: Path) -> bytes:
+    return docx_sample_file.read_bytes()
+
+
 @pytest.fixture(scope="session")
 def odt_sample_file(sample_directory: Path) -> Path:
     return sample_directory / "sample.odt"
@@ -165,35 +236,39 @@ def pdf_sample_one_file(sample_directory: Path) -> Path:
 
 
 @pytest.fixture(scope="session")
-def output_file_save_directory() -> Path:
-    return Path(__file__).parent.resolve() / "outputs"
+def merge_sample_files(sample_directory: Path) -> list[Path]:
+    """
+    Two PDFs, listed in the order they should be merged, which is the reverse of
+    their alphabetical order
+    """
+    return [sample_directory / "z_first_merge.pdf", sample_directory / "a_merge_second.pdf"]
 
 
 @pytest.fixture(scope="session")
-def save_output_files(output_file_save_directory: Path) -> bool:
-    val = True
-    if val:
-        shutil.rmtree(output_file_save_directory, ignore_errors=True)
-        output_file_save_directory.mkdir()
-    return val
+def client(gotenberg_host: str) -> Generator[GotenbergClient, None, None]:
+    """
+    One client for the whole session, so every test reuses its open connections
+    to Gotenberg instead of opening new ones.  Tests must not change its headers;
+    use mocked_client for that
+    """
+    with GotenbergClient(host=gotenberg_host, log_level=logging.INFO) as client:
+        yield client
 
 
 @pytest.fixture
-def output_saver_factory(request, save_output_files: bool, output_file_save_directory: Path):  # noqa: FBT001
-    def _save_the_item(response: Union[SingleFileResponse, ZipFileResponse], extra: str = ""):  # noqa: ARG001
-        if save_output_files:
-            extension_mapping = {
-                "application/zip": ".zip",
-                "application/pdf": ".pdf",
-                "image/png": ".png",
-            }
-            extension = extension_mapping[response.headers["Content-Type"]]
-            response.to_file(output_file_save_directory / f"{request.node.originalname}{extension}")
-
-    return _save_the_item
+def libre_pdf_route(client: GotenbergClient) -> Generator[LibreOfficeConvertRoute, None, None]:
+    """
+    A fresh LibreOffice conversion route from the session client, closed after the test
+    """
+    with client.libre_office.to_pdf() as route:
+        yield route
 
 
 @pytest.fixture
-def client(gotenberg_host: str) -> Generator[GotenbergClient, None, None]:
-    with GotenbergClient(host=gotenberg_host, log_level=logging.INFO) as client:
+def mocked_client() -> Generator[GotenbergClient, None, None]:
+    """
+    A client for tests which mock every response via httpx_mock, so no Gotenberg
+    container is required
+    """
+    with GotenbergClient(host="http://localhost:3000", log_level=logging.INFO) as client:
         yield client
@@ -3,19 +3,23 @@
 # SPDX-License-Identifier: MPL-2.0
 from pathlib import Path
 
-import pikepdf
 import pytest
 from httpx import codes
 from pytest_httpx import HTTPXMock
 
 from gotenberg_client import GotenbergClient
+from gotenberg_client import SingleFileResponse
 from gotenberg_client.options import A4
 from gotenberg_client.options import MarginType
 from gotenberg_client.options import MarginUnitType
 from gotenberg_client.options import PageMarginsType
 from gotenberg_client.options import PageOrientation
 from gotenberg_client.options import PdfAFormat
+from tests.utils import assert_content_type
+from tests.utils import convert_concurrently
+from tests.utils import pdfa_status
 from tests.utils import verify_stream_contains
+from tests.utils import verify_stream_contains_all
 
 
 class TestConvertChromiumHtmlRoute:
@@ -24,8 +28,7 @@ class TestConvertChromiumHtmlRoute:
             resp = route.index(basic_html_file).run_with_retry()
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        assert_content_type(resp, "application/pdf")
 
     def test_convert_with_header_footer(
         self,
@@ -38,29 +41,27 @@ class TestConvertChromiumHtmlRoute:
             resp = route.index(basic_html_file).header(header_html_file).footer(footer_html_file).run_with_retry()
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        assert_content_type(resp, "application/pdf")
 
     def test_convert_additional_files(
         self,
         client: GotenbergClient,
         complex_html_file: Path,
-        img_gif_file: Path,
-        font_file: Path,
-        css_style_file: Path,
+        img_gif_bytes: bytes,
+        font_bytes: bytes,
+        css_style_bytes: bytes,
     ):
         with client.chromium.html_to_pdf() as route:
             resp = (
                 route.index(complex_html_file)
-                .resource(img_gif_file)
-                .resource(font_file)
-                .resource(css_style_file)
+                .bytes_resource(img_gif_bytes, name="img.gif", mime_type="image/gif")
+                .bytes_resource(font_bytes, name="font.woff", mime_type="font/woff")
+                .bytes_resource(css_style_bytes, name="style.css", mime_type="text/css")
                 .run_with_retry()
             )
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        assert_content_type(resp, "application/pdf")
 
     def test_convert_html_from_string(self, client: GotenbergClient, basic_html_file: Path):
         html_str = basic_html_file.read_text()
@@ -69,33 +70,21 @@ class TestConvertChromiumHtmlRoute:
             resp = route.string_index(html_str).run_with_retry()
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        assert_content_type(resp, "application/pdf")
 
-    @pytest.mark.parametrize(
-        ("gt_format", "pike_format"),
-        [(PdfAFormat.A2b, "2B"), (PdfAFormat.A3b, "3B")],
-    )
-    def test_convert_pdfa_format(
-        self,
-        client: GotenbergClient,
-        basic_html_file: Path,
-        tmp_path: Path,
-        gt_format: PdfAFormat,
-        pike_format: str,
-    ):
-        with client.chromium.html_to_pdf() as route:
-            resp = route.index(basic_html_file).pdf_format(gt_format).run_with_retry()
+    def test_convert_pdfa_formats(self, client: GotenbergClient, basic_html_file: Path):
+        formats = {PdfAFormat.A2b: "2B", PdfAFormat.A3b: "3B"}
 
-        assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        def _convert(gt_format: PdfAFormat) -> SingleFileResponse:
+            with client.chromium.html_to_pdf() as route:
+                return route.index(basic_html_file).pdf_format(gt_format).run_with_retry()
+
+        responses = convert_concurrently(_convert, formats)
 
-        output = tmp_path / "test_convert_pdfa_format.pdf"
-        resp.to_file(output)
-        with pikepdf.open(output) as pdf:
-            meta = pdf.open_metadata()
-            assert meta.pdfa_status == pike_format
+        for resp, pike_format in zip(responses, formats.values()):
+            assert resp.status_code == codes.OK
+            assert_content_type(resp, "application/pdf")
+            assert pdfa_status(resp.content) == pike_format
 
     def test_convert_additional_file_bytes_io_with_name(
         self,
@@ -114,29 +103,24 @@ class TestConvertChromiumHtmlRoute:
             )
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        assert_content_type(resp, "application/pdf")
 
 
 class TestConvertChromiumHtmlRouteMocked:
-    def test_convert_page_size(self, client: GotenbergClient, sample_directory: Path, httpx_mock: HTTPXMock):
+    def test_convert_page_size(self, mocked_client: GotenbergClient, basic_html_file: Path, httpx_mock: HTTPXMock):
         httpx_mock.add_response(method="POST")
-        test_file = sample_directory / "basic.html"
 
-        with client.chromium.html_to_pdf() as route:
-            _ = route.index(test_file).size(A4).run()
+        with mocked_client.chromium.html_to_pdf() as route:
+            _ = route.index(basic_html_file).size(A4).run()
 
-        request = httpx_mock.get_request()
-        verify_stream_contains(request, "paperWidth", "8.27")
-        verify_stream_contains(request, "paperHeight", "11.7")
+        verify_stream_contains_all(httpx_mock.get_request(), {"paperWidth": "8.27", "paperHeight": "11.7"})
 
-    def test_convert_margin(self, client: GotenbergClient, sample_directory: Path, httpx_mock: HTTPXMock):
+    def test_convert_margin(self, mocked_client: GotenbergClient, basic_html_file: Path, httpx_mock: HTTPXMock):
         httpx_mock.add_response(method="POST")
-        test_file = sample_directory / "basic.html"
 
-        with client.chromium.html_to_pdf() as route:
+        with mocked_client.chromium.html_to_pdf() as route:
             _ = (
-                route.index(test_file)
+                route.index(basic_html_file)
                 .margins(
                     PageMarginsType(
                         MarginType(1, MarginUnitType.Centimeters),
@@ -148,37 +132,62 @@ class TestConvertChromiumHtmlRouteMocked:
                 .run()
             )
 
-        request = httpx_mock.get_request()
-        verify_stream_contains(request, "marginTop", "1cm")
-        verify_stream_contains(request, "marginBottom", "2pc")
-        verify_stream_contains(request, "marginLeft", "3mm")
-        verify_stream_contains(request, "marginRight", "4")
+        verify_stream_contains_all(
+            httpx_mock.get_request(),
+            {"marginTop": "1cm", "marginBottom": "2pc", "marginLeft": "3mm", "marginRight": "4"},
+        )
 
-    def test_convert_render_control(self, client: GotenbergClient, sample_directory: Path, httpx_mock: HTTPXMock):
+    def test_convert_render_control(
+        self,
+        mocked_client: GotenbergClient,
+        basic_html_file: Path,
+        httpx_mock: HTTPXMock,
+    ):
         httpx_mock.add_response(method="POST")
-        test_file = sample_directory / "basic.html"
 
-        with client.chromium.html_to_pdf() as route:
-            _ = route.index(test_file).render_wait(500.0).run()
+        with mocked_client.chromium.html_to_pdf() as route:
+            _ = route.index(basic_html_file).render_wait(500.0).run()
 
         verify_stream_contains(httpx_mock.get_request(), "waitDelay", "500.0")
 
+    def test_convert_bytes_resource(
+        self,
+        mocked_client: GotenbergClient,
+        basic_html_file: Path,
+        img_gif_bytes: bytes,
+        css_style_bytes: bytes,
+        httpx_mock: HTTPXMock,
+    ):
+        httpx_mock.add_response(method="POST")
+
+        with mocked_client.chromium.html_to_pdf() as route:
+            _ = (
+                route.index(basic_html_file)
+                .bytes_resource(img_gif_bytes, name="img.gif", mime_type="image/gif")
+                .bytes_resource(css_style_bytes, name="style.css")
+                .run()
+            )
+
+        request = httpx_mock.get_request()
+        assert b'filename="img.gif"\r\nContent-Type: image/gif\r\n\r\n' + img_gif_bytes in request.content
+        # Without a given MIME type, it is guessed from the name
+        assert b'filename="style.css"\r\nContent-Type: text/css\r\n\r\n' + css_style_bytes in request.content
+
     @pytest.mark.parametrize(
         ("orientation"),
         [PageOrientation.Landscape, PageOrientation.Portrait],
     )
     def test_convert_orientation(
         self,
-        client: GotenbergClient,
-        sample_directory: Path,
+        mocked_client: GotenbergClient,
+        basic_html_file: Path,
         httpx_mock: HTTPXMock,
         orientation: PageOrientation,
     ):
         httpx_mock.add_response(method="POST")
-        test_file = sample_directory / "basic.html"
 
-        with client.chromium.html_to_pdf() as route:
-            _ = route.index(test_file).orient(orientation).run()
+        with mocked_client.chromium.html_to_pdf() as route:
+            _ = route.index(basic_html_file).orient(orientation).run()
 
         verify_stream_contains(
             httpx_mock.get_request(),
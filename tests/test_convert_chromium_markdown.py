@@ -6,9 +6,10 @@ from pathlib import Path
 from httpx import codes
 
 from gotenberg_client import GotenbergClient
+from tests.utils import assert_content_type
 
 
-class TestConvertChromiumUrlRoute:
+class TestConvertChromiumMarkdownRoute:
     def test_basic_convert(
         self,
         client: GotenbergClient,
@@ -29,15 +30,14 @@ class TestConvertChromiumUrlRoute:
             )
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        assert_content_type(resp, "application/pdf")
 
     def test_basic_convert_string_references(
         self,
         client: GotenbergClient,
         markdown_index_file: Path,
-        markdown_sample_one_file: Path,
-        markdown_sample_two_file: Path,
+        markdown_sample_one_text: str,
+        markdown_sample_two_text: str,
         img_gif_file: Path,
         font_file: Path,
         css_style_file: Path,
@@ -47,8 +47,8 @@ class TestConvertChromiumUrlRoute:
                 route.index(markdown_index_file)
                 .string_resources(
                     [
-                        (markdown_sample_one_file.read_text(), "markdown1.md", "text/markdown"),
-                        (markdown_sample_two_file.read_text(), "markdown2.md", "text/markdown"),
+                        (markdown_sample_one_text, "markdown1.md", "text/markdown"),
+                        (markdown_sample_two_text, "markdown2.md", "text/markdown"),
                     ],
                 )
                 .resources([img_gif_file, font_file])
@@ -57,5 +57,4 @@ class TestConvertChromiumUrlRoute:
             )
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        assert_content_type(resp, "application/pdf")
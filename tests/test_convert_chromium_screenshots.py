@@ -1,113 +1,100 @@
 # SPDX-FileCopyrightText: 2023-present Trenton H <rda0128ou@mozmail.com>
 #
 # SPDX-License-Identifier: MPL-2.0
+from collections.abc import Callable
 from pathlib import Path
 from typing import Literal
 
 import pytest
 from httpx import codes
+from pytest_httpx import HTTPXMock
 
 from gotenberg_client import GotenbergClient
+from gotenberg_client import SingleFileResponse
+from gotenberg_client._convert.chromium import ScreenshotRouteUrl
+from tests.utils import assert_content_type
+from tests.utils import convert_concurrently
+from tests.utils import verify_stream_contains
 
 
 @pytest.mark.usefixtures("web_server_host")
+@pytest.mark.xdist_group("chromium_screenshots")
 class TestChromiumScreenshots:
     def test_basic_screenshot(self, client: GotenbergClient, webserver_docker_internal_url: str):
         with client.chromium.screenshot_url() as route:
             resp = route.url(webserver_docker_internal_url).run_with_retry()
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "image/png"
+        assert_content_type(resp, "image/png")
 
-    @pytest.mark.parametrize(
-        "image_format",
-        ["png", "webp", "jpeg"],
-    )
-    def test_screenshot_formats(
-        self,
-        client: GotenbergClient,
-        webserver_docker_internal_url: str,
-        image_format: Literal["png", "webp", "jpeg"],
-    ):
-        with client.chromium.screenshot_url() as route:
-            resp = route.url(webserver_docker_internal_url).output_format(image_format).run_with_retry()
-
-        assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == f"image/{image_format}"
-
-    def test_screenshot_quality_valid(self, client: GotenbergClient, webserver_docker_internal_url: str):
-        with client.chromium.screenshot_url() as route:
-            resp = route.url(webserver_docker_internal_url).quality(80).run_with_retry()
-
-        assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "image/png"
-
-    def test_screenshot_quality_too_low(self, client: GotenbergClient, webserver_docker_internal_url: str):
-        with client.chromium.screenshot_url() as route:
-            resp = route.url(webserver_docker_internal_url).quality(-10).run_with_retry()
-
-        assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "image/png"
-
-    def test_screenshot_quality_too_high(self, client: GotenbergClient, webserver_docker_internal_url: str):
-        with client.chromium.screenshot_url() as route:
-            resp = route.url(webserver_docker_internal_url).quality(101).run_with_retry()
-
-        assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "image/png"
+    def test_screenshot_formats(self, client: GotenbergClient, webserver_docker_internal_url: str):
+        image_formats: list[Literal["png", "webp", "jpeg"]] = ["png", "webp", "jpeg"]
 
-    def test_screenshot_optimize_speed(self, client: GotenbergClient, webserver_docker_internal_url: str):
-        with client.chromium.screenshot_url() as route:
-            resp = route.url(webserver_docker_internal_url).optimize_speed().run_with_retry()
-
-        assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "image/png"
+        def _screenshot(image_format: Literal["png", "webp", "jpeg"]) -> SingleFileResponse:
+            with client.chromium.screenshot_url() as route:
+                return route.url(webserver_docker_internal_url).output_format(image_format).run_with_retry()
 
-    def test_screenshot_optimize_quality(self, client: GotenbergClient, webserver_docker_internal_url: str):
-        with client.chromium.screenshot_url() as route:
-            resp = route.url(webserver_docker_internal_url).optimize_size().run_with_retry()
+        responses = convert_concurrently(_screenshot, image_formats)
 
-        assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "image/png"
+        for resp, image_format in zip(responses, image_formats):
+            assert resp.status_code == codes.OK
+            assert_content_type(resp, f"image/{image_format}")
 
-    def test_network_idle_on(self, client: GotenbergClient, webserver_docker_internal_url: str):
-        with client.chromium.screenshot_url() as route:
-            resp = route.url(webserver_docker_internal_url).skip_network_idle().run_with_retry()
 
-        assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "image/png"
+class TestChromiumScreenshotsMocked:
+    @pytest.mark.parametrize(
+        ("modifier", "key", "value"),
+        [
+            pytest.param(lambda route: route.quality(80), "quality", "80", id="quality-valid"),
+            pytest.param(lambda route: route.quality(-10), "quality", "0", id="quality-too-low"),
+            pytest.param(lambda route: route.quality(101), "quality", "100", id="quality-too-high"),
+            pytest.param(lambda route: route.optimize_speed(), "optimizeForSpeed", "true", id="optimize-speed"),
+            pytest.param(lambda route: route.optimize_size(), "optimizeForSpeed", "false", id="optimize-size"),
+            pytest.param(lambda route: route.skip_network_idle(), "skipNetworkIdleEvent", "true", id="network-idle-on"),
+            pytest.param(
+                lambda route: route.use_network_idle(),
+                "skipNetworkIdleEvent",
+                "false",
+                id="network-idle-off",
+            ),
+            pytest.param(
+                lambda route: route.fail_on_status_codes([499, 599]),
+                "failOnHttpStatusCodes",
+                "[499,599]",
+                id="status-codes",
+            ),
+        ],
+    )
+    def test_screenshot_options(
+        self,
+        mocked_client: GotenbergClient,
+        webserver_docker_internal_url: str,
+        httpx_mock: HTTPXMock,
+        modifier: Callable[[ScreenshotRouteUrl], ScreenshotRouteUrl],
+        key: str,
+        value: str,
+    ):
+        httpx_mock.add_response(method="POST", headers={"Content-Type": "image/png"})
 
-    def test_network_idle_off(self, client: GotenbergClient, webserver_docker_internal_url: str):
-        with client.chromium.screenshot_url() as route:
-            resp = route.url(webserver_docker_internal_url).use_network_idle().run_with_retry()
+        with mocked_client.chromium.screenshot_url() as route:
+            resp = modifier(route.url(webserver_docker_internal_url)).run()
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "image/png"
+        assert_content_type(resp, "image/png")
+        verify_stream_contains(httpx_mock.get_request(), key, value)
 
-    def test_status_codes(self, client: GotenbergClient, webserver_docker_internal_url: str):
-        with client.chromium.screenshot_url() as route:
-            resp = route.url(webserver_docker_internal_url).fail_on_status_codes([499, 599]).run_with_retry()
-
-        assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "image/png"
+    def test_status_codes_empty(
+        self,
+        mocked_client: GotenbergClient,
+        webserver_docker_internal_url: str,
+        httpx_mock: HTTPXMock,
+    ):
+        httpx_mock.add_response(method="POST", headers={"Content-Type": "image/png"})
 
-    def test_status_codes_empty(self, client: GotenbergClient, webserver_docker_internal_url: str):
-        with client.chromium.screenshot_url() as route:
-            resp = route.url(webserver_docker_internal_url).fail_on_status_codes([]).run_with_retry()
+        with mocked_client.chromium.screenshot_url() as route:
+            _ = route.url(webserver_docker_internal_url).fail_on_status_codes([]).run()
 
-        assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "image/png"
+        assert b"failOnHttpStatusCodes" not in httpx_mock.get_request().content
 
 
 class TestChromiumScreenshotsFromMarkdown:
@@ -125,14 +112,12 @@ class TestChromiumScreenshotsFromMarkdown:
                 .run_with_retry()
             )
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "image/png"
+        assert_content_type(resp, "image/png")
 
 
 class TestChromiumScreenshotsFromHtml:
-    def test_markdown_screenshot(self, client: GotenbergClient, basic_html_file: Path):
+    def test_html_screenshot(self, client: GotenbergClient, basic_html_file: Path):
         with client.chromium.screenshot_html() as route:
             resp = route.index(basic_html_file).run_with_retry()
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "image/png"
+        assert_content_type(resp, "image/png")
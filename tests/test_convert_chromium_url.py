@@ -2,6 +2,7 @@
 #
 # SPDX-License-Identifier: MPL-2.0
 import json
+import re
 
 import pytest
 from httpx import codes
@@ -9,204 +10,158 @@ from pytest_httpx import HTTPXMock
 
 from gotenberg_client import GotenbergClient
 from gotenberg_client.options import EmulatedMediaType
+from tests.utils import assert_content_type
+from tests.utils import parse_form_fields
 from tests.utils import verify_stream_contains
 
+# Only requests to the URL conversion route are answered
+URL_TO_PDF_ROUTE = re.compile(r".*/forms/chromium/convert/url$")
+
+EXTRA_HEADERS = {"X-Auth-Token": "Secure"}
+EXTRA_HEADERS_JSON = json.dumps(EXTRA_HEADERS)
+
 
 @pytest.mark.usefixtures("webserver_docker_internal_url")
+@pytest.mark.xdist_group("chromium_url")
 class TestConvertChromiumUrlRoute:
     def test_basic_convert(self, client: GotenbergClient, webserver_docker_internal_url: str):
         with client.chromium.url_to_pdf() as route:
             resp = route.url(webserver_docker_internal_url).run_with_retry()
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        assert_content_type(resp, "application/pdf")
 
 
 @pytest.mark.usefixtures("webserver_docker_internal_url")
 class TestConvertChromiumUrlMocked:
+    @pytest.fixture(autouse=True)
+    def _mock_post(self, httpx_mock: HTTPXMock) -> None:
+        """
+        Every test here makes a single conversion request, so its response is registered here
+        """
+        httpx_mock.add_response(method="POST", url=URL_TO_PDF_ROUTE, headers={"Content-Type": "application/pdf"})
+
+    def test_basic_convert(
+        self,
+        mocked_client: GotenbergClient,
+        webserver_docker_internal_url: str,
+        httpx_mock: HTTPXMock,
+    ):
+        with mocked_client.chromium.url_to_pdf() as route:
+            resp = route.url(webserver_docker_internal_url).run()
+
+        assert resp.status_code == codes.OK
+        request = httpx_mock.get_request()
+        assert request is not None
+        assert request.method == "POST"
+        assert request.url.path.endswith("/forms/chromium/convert/url")
+        assert parse_form_fields(request) == {"url": webserver_docker_internal_url}
+
     @pytest.mark.parametrize(
         ("emulation"),
         [EmulatedMediaType.Screen, EmulatedMediaType.Print],
     )
     def test_convert_orientation(
         self,
-        client: GotenbergClient,
+        mocked_client: GotenbergClient,
         webserver_docker_internal_url: str,
         httpx_mock: HTTPXMock,
         emulation: EmulatedMediaType,
     ):
-        httpx_mock.add_response(method="POST")
-
-        with client.chromium.url_to_pdf() as route:
+        with mocked_client.chromium.url_to_pdf() as route:
             _ = route.url(webserver_docker_internal_url).media_type(emulation).run()
 
         verify_stream_contains(
-            httpx_mock.get_request(),
+            httpx_mock.get_request(url=URL_TO_PDF_ROUTE),
             "emulatedMediaType",
             "screen" if emulation == EmulatedMediaType.Screen else "print",
         )
 
     @pytest.mark.parametrize(
-        ("method"),
-        ["prefer_css_page_size", "prefer_set_page_size"],
-    )
-    def test_convert_css_or_not_size(
-        self,
-        client: GotenbergClient,
-        webserver_docker_internal_url: str,
-        httpx_mock: HTTPXMock,
-        method: str,
-    ):
-        httpx_mock.add_response(method="POST")
-
-        with client.chromium.url_to_pdf() as route:
-            route.url(webserver_docker_internal_url)
-            getattr(route, method)()
-            _ = route.run()
-
-        verify_stream_contains(
-            httpx_mock.get_request(),
-            "preferCssPageSize",
-            "true" if method == "prefer_css_page_size" else "false",
-        )
-
-    @pytest.mark.parametrize(
-        ("method"),
-        ["background_graphics", "no_background_graphics"],
-    )
-    def test_convert_background_graphics_or_not(
-        self,
-        client: GotenbergClient,
-        webserver_docker_internal_url: str,
-        httpx_mock: HTTPXMock,
-        method: str,
-    ):
-        httpx_mock.add_response(method="POST")
-
-        with client.chromium.url_to_pdf() as route:
-            route.url(webserver_docker_internal_url)
-            getattr(route, method)()
-            _ = route.run()
-
-        verify_stream_contains(
-            httpx_mock.get_request(),
-            "printBackground",
-            "true" if method == "background_graphics" else "false",
-        )
-
-    @pytest.mark.parametrize(
-        ("method"),
-        ["hide_background", "show_background"],
-    )
-    def test_convert_hide_background_or_not(
-        self,
-        client: GotenbergClient,
-        webserver_docker_internal_url: str,
-        httpx_mock: HTTPXMock,
-        method: str,
-    ):
-        httpx_mock.add_response(method="POST")
-
-        with client.chromium.url_to_pdf() as route:
-            route.url(webserver_docker_internal_url)
-            getattr(route, method)()
-            _ = route.run()
-
-        verify_stream_contains(
-            httpx_mock.get_request(),
-            "omitBackground",
-            "true" if method == "hide_background" else "false",
-        )
-
-    @pytest.mark.parametrize(
-        ("method"),
-        ["fail_on_exceptions", "dont_fail_on_exceptions"],
+        ("method", "field", "expected"),
+        [
+            ("prefer_css_page_size", "preferCssPageSize", "true"),
+            ("prefer_set_page_size", "preferCssPageSize", "false"),
+            ("background_graphics", "printBackground", "true"),
+            ("no_background_graphics", "printBackground", "false"),
+            ("hide_background", "omitBackground", "true"),
+            ("show_background", "omitBackground", "false"),
+            ("fail_on_exceptions", "failOnConsoleExceptions", "true"),
+            ("dont_fail_on_exceptions", "failOnConsoleExceptions", "false"),
+        ],
     )
-    def test_convert_fail_exceptions(
+    def test_boolean_flag(
         self,
-        client: GotenbergClient,
+        mocked_client: GotenbergClient,
         webserver_docker_internal_url: str,
         httpx_mock: HTTPXMock,
         method: str,
+        field: str,
+        expected: str,
     ):
-        httpx_mock.add_response(method="POST")
-
-        with client.chromium.url_to_pdf() as route:
+        with mocked_client.chromium.url_to_pdf() as route:
             route.url(webserver_docker_internal_url)
             getattr(route, method)()
             _ = route.run()
 
-        verify_stream_contains(
-            httpx_mock.get_request(),
-            "failOnConsoleExceptions",
-            "true" if method == "fail_on_exceptions" else "false",
-        )
+        verify_stream_contains(httpx_mock.get_request(url=URL_TO_PDF_ROUTE), field, expected)
 
     def test_convert_scale(
         self,
-        client: GotenbergClient,
+        mocked_client: GotenbergClient,
         webserver_docker_internal_url: str,
         httpx_mock: HTTPXMock,
     ):
-        httpx_mock.add_response(method="POST")
-
-        with client.chromium.url_to_pdf() as route:
+        with mocked_client.chromium.url_to_pdf() as route:
             _ = route.url(webserver_docker_internal_url).scale(1.5).run()
 
         verify_stream_contains(
-            httpx_mock.get_request(),
+            httpx_mock.get_request(url=URL_TO_PDF_ROUTE),
             "scale",
             "1.5",
         )
 
     def test_convert_page_ranges(
         self,
-        client: GotenbergClient,
+        mocked_client: GotenbergClient,
         webserver_docker_internal_url: str,
         httpx_mock: HTTPXMock,
     ):
-        httpx_mock.add_response(method="POST")
-
-        with client.chromium.url_to_pdf() as route:
+        with mocked_client.chromium.url_to_pdf() as route:
             _ = route.url(webserver_docker_internal_url).page_ranges("1-5").run()
 
         verify_stream_contains(
-            httpx_mock.get_request(),
+            httpx_mock.get_request(url=URL_TO_PDF_ROUTE),
             "nativePageRanges",
             "1-5",
         )
 
     def test_convert_url_render_wait(
         self,
-        client: GotenbergClient,
+        mocked_client: GotenbergClient,
         webserver_docker_internal_url: str,
         httpx_mock: HTTPXMock,
     ):
-        httpx_mock.add_response(method="POST")
-
-        with client.chromium.url_to_pdf() as route:
+        with mocked_client.chromium.url_to_pdf() as route:
             _ = route.url(webserver_docker_internal_url).render_wait(500).run()
 
         verify_stream_contains(
-            httpx_mock.get_request(),
+            httpx_mock.get_request(url=URL_TO_PDF_ROUTE),
             "waitDelay",
             "500",
         )
 
     def test_convert_url_render_expression(
         self,
-        client: GotenbergClient,
+        mocked_client: GotenbergClient,
         webserver_docker_internal_url: str,
         httpx_mock: HTTPXMock,
     ):
-        httpx_mock.add_response(method="POST")
-
-        with client.chromium.url_to_pdf() as route:
+        with mocked_client.chromium.url_to_pdf() as route:
             _ = route.url(webserver_docker_internal_url).render_expr("wait while false;").run()
 
         verify_stream_contains(
-            httpx_mock.get_request(),
+            httpx_mock.get_request(url=URL_TO_PDF_ROUTE),
             "waitForExpression",
             "wait while false;",
         )
@@ -214,35 +169,29 @@ class TestConvertChromiumUrlMocked:
     @pytest.mark.filterwarnings("ignore::DeprecationWarning")
     def test_convert_url_user_agent(
         self,
-        client: GotenbergClient,
+        mocked_client: GotenbergClient,
         webserver_docker_internal_url: str,
         httpx_mock: HTTPXMock,
     ):
-        httpx_mock.add_response(method="POST")
-
-        with client.chromium.url_to_pdf() as route:
+        with mocked_client.chromium.url_to_pdf() as route:
             _ = route.url(webserver_docker_internal_url).user_agent("Firefox").run()
 
         verify_stream_contains(
-            httpx_mock.get_request(),
+            httpx_mock.get_request(url=URL_TO_PDF_ROUTE),
             "userAgent",
             "Firefox",
         )
 
     def test_convert_url_headers(
         self,
-        client: GotenbergClient,
+        mocked_client: GotenbergClient,
         webserver_docker_internal_url: str,
         httpx_mock: HTTPXMock,
     ):
-        httpx_mock.add_response(method="POST")
-
-        headers = {"X-Auth-Token": "Secure"}
-
-        with client.chromium.url_to_pdf() as route:
-            _ = route.url(webserver_docker_internal_url).headers(headers).run()
+        with mocked_client.chromium.url_to_pdf() as route:
+            _ = route.url(webserver_docker_internal_url).headers(EXTRA_HEADERS).run()
         verify_stream_contains(
-            httpx_mock.get_request(),
+            httpx_mock.get_request(url=URL_TO_PDF_ROUTE),
             "extraHttpHeaders",
-            json.dumps(headers),
+            EXTRA_HEADERS_JSON,
         )
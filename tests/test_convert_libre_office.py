@@ -1,138 +1,190 @@
 # SPDX-FileCopyrightText: 2023-present Trenton H <rda0128ou@mozmail.com>
 #
 # SPDX-License-Identifier: MPL-2.0
+import zipfile
+from io import BytesIO
 from pathlib import Path
 from unittest.mock import patch
 
-import pikepdf
 import pytest
 from httpx import codes
+from pytest_httpx import HTTPXMock
 
 from gotenberg_client import GotenbergClient
 from gotenberg_client import SingleFileResponse
 from gotenberg_client import ZipFileResponse
+from gotenberg_client._convert.libre_office import LibreOfficeConvertRoute
 from gotenberg_client._utils import guess_mime_type_stdlib
+from gotenberg_client.options import PageOrientation
 from gotenberg_client.options import PdfAFormat
+from tests.utils import assert_content_type
+from tests.utils import convert_concurrently
+from tests.utils import pdfa_status
+from tests.utils import verify_stream_contains_all
 
+DOCX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
 
-class TestLibreOfficeConvert:
-    def test_libre_office_convert_docx_format(self, client: GotenbergClient, docx_sample_file: Path):
-        with client.libre_office.to_pdf() as route:
-            resp = route.convert(docx_sample_file).run_with_retry()
-
-        assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
 
-    def test_libre_office_convert_docx_format_for_coverage(
+@pytest.mark.xdist_group("libre_office")
+class TestLibreOfficeConvert:
+    def test_libre_office_convert_formats(
         self,
-        client: GotenbergClient,
+        libre_pdf_route: LibreOfficeConvertRoute,
         docx_sample_file: Path,
+        odt_sample_file: Path,
+        xlsx_sample_file: Path,
+        ods_sample_file: Path,
     ):
-        with client.libre_office.to_pdf() as route:
-            try:
-                resp = route.convert(docx_sample_file).run()
-            except:  # noqa: E722 - this is only for coverage
-                return
-
-        assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
-
-    def test_libre_office_convert_odt_format(self, client: GotenbergClient, odt_sample_file: Path):
-        with client.libre_office.to_pdf() as route:
-            resp = route.convert(odt_sample_file).run_with_retry()
-
-        assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
-
-    def test_libre_office_convert_xlsx_format(self, client: GotenbergClient, xlsx_sample_file: Path):
-        with client.libre_office.to_pdf() as route:
-            resp = route.convert(xlsx_sample_file).run_with_retry()
+        """
+        Converts each sample format in a single request, so LibreOffice is only
+        invoked once for all of them
+        """
+        resp = (
+            libre_pdf_route.convert_files([docx_sample_file, odt_sample_file, xlsx_sample_file, ods_sample_file])
+            .no_merge()
+            .run_with_retry()
+        )
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        assert_content_type(resp, "application/zip")
 
-    def test_libre_office_convert_ods_format(self, client: GotenbergClient, ods_sample_file: Path):
-        with client.libre_office.to_pdf() as route:
-            resp = route.convert(ods_sample_file).run_with_retry()
-
-        assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        with zipfile.ZipFile(BytesIO(resp.content)) as zip_file:
+            names = zip_file.namelist()
+        assert len(names) == 4
+        assert all(name.endswith(".pdf") for name in names)
 
     def test_libre_office_convert_multiples_format_no_merge(
         self,
-        client: GotenbergClient,
+        libre_pdf_route: LibreOfficeConvertRoute,
         docx_sample_file: Path,
         odt_sample_file: Path,
-        tmp_path: Path,
     ):
-        with client.libre_office.to_pdf() as route:
-            resp = route.convert_files([docx_sample_file, odt_sample_file]).no_merge().run_with_retry()
+        resp = libre_pdf_route.convert_files([docx_sample_file, odt_sample_file]).no_merge().run_with_retry()
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/zip"
+        assert_content_type(resp, "application/zip")
         assert isinstance(resp, ZipFileResponse)
         assert resp.is_zip
 
-        resp.extract_to(tmp_path)
-
-        assert len(list(tmp_path.iterdir())) == 2
+        # Only the member count matters, so read the central directory instead of extracting
+        with zipfile.ZipFile(BytesIO(resp.content)) as zip_file:
+            assert len(zip_file.namelist()) == 2
 
     def test_libre_office_convert_multiples_format_merged(
         self,
-        client: GotenbergClient,
+        libre_pdf_route: LibreOfficeConvertRoute,
         docx_sample_file: Path,
         odt_sample_file: Path,
     ):
-        with client.libre_office.to_pdf() as route:
-            resp = route.convert_files([docx_sample_file, odt_sample_file]).merge().run_with_retry()
+        resp = libre_pdf_route.convert_files([docx_sample_file, odt_sample_file]).merge().run_with_retry()
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        assert_content_type(resp, "application/pdf")
         assert isinstance(resp, SingleFileResponse)
 
     def test_libre_office_convert_std_lib_mime(
         self,
-        client: GotenbergClient,
+        libre_pdf_route: LibreOfficeConvertRoute,
         docx_sample_file: Path,
         odt_sample_file: Path,
     ):
         with patch("gotenberg_client._utils.guess_mime_type") as mocked_guess_mime_type:
             mocked_guess_mime_type.side_effect = guess_mime_type_stdlib
+            resp = libre_pdf_route.convert_files([docx_sample_file, odt_sample_file]).no_merge().run_with_retry()
+
+            assert resp.status_code == codes.OK
+            assert_content_type(resp, "application/zip")
+
+    def test_libre_office_convert_xlsx_format_pdfa(self, client: GotenbergClient, xlsx_sample_file: Path):
+        formats = {PdfAFormat.A2b: "2B", PdfAFormat.A3b: "3B"}
+
+        def _convert(gt_format: PdfAFormat) -> SingleFileResponse:
             with client.libre_office.to_pdf() as route:
-                resp = route.convert_files([docx_sample_file, odt_sample_file]).no_merge().run_with_retry()
+                return route.convert(xlsx_sample_file).pdf_format(gt_format).run_with_retry()
+
+        responses = convert_concurrently(_convert, formats)
 
+        for resp, pike_format in zip(responses, formats.values()):
             assert resp.status_code == codes.OK
-            assert "Content-Type" in resp.headers
-            assert resp.headers["Content-Type"] == "application/zip"
-
-    @pytest.mark.parametrize(
-        ("gt_format", "pike_format"),
-        [(PdfAFormat.A2b, "2B"), (PdfAFormat.A3b, "3B")],
-    )
-    def test_libre_office_convert_xlsx_format_pdfa(
+            assert_content_type(resp, "application/pdf")
+
+            assert pdfa_status(resp.content) == pike_format
+
+
+class TestLibreOfficeConvertMocked:
+    def test_libre_office_settings(
         self,
-        client: GotenbergClient,
-        xlsx_sample_file: Path,
-        tmp_path: Path,
-        gt_format: PdfAFormat,
-        pike_format: str,
+        mocked_client: GotenbergClient,
+        docx_sample_file: Path,
+        httpx_mock: HTTPXMock,
+    ):
+        httpx_mock.add_response(method="POST", headers={"Content-Type": "application/pdf"})
+
+        with mocked_client.libre_office.to_pdf() as route:
+            _ = (
+                route.convert(docx_sample_file)
+                .orient(PageOrientation.Landscape)
+                .page_ranges("1-2")
+                .pdf_format(PdfAFormat.A2b)
+                .enable_universal_access()
+                .merge()
+                .run()
+            )
+
+        verify_stream_contains_all(
+            httpx_mock.get_request(),
+            {
+                "landscape": "true",
+                "nativePageRanges": "1-2",
+                "pdfa": "PDF/A-2b",
+                "pdfua": "true",
+                "merge": "true",
+            },
+        )
+
+    def test_libre_office_convert_run(
+        self,
+        mocked_client: GotenbergClient,
+        docx_sample_file: Path,
+        httpx_mock: HTTPXMock,
+    ):
+        httpx_mock.add_response(method="POST", headers={"Content-Type": "application/pdf"})
+
+        with mocked_client.libre_office.to_pdf() as route:
+            resp = route.convert(docx_sample_file).run()
+
+        assert resp.status_code == codes.OK
+        assert_content_type(resp, "application/pdf")
+        assert isinstance(resp, SingleFileResponse)
+
+    def test_libre_office_convert_run_no_merge(
+        self,
+        mocked_client: GotenbergClient,
+        docx_sample_file: Path,
+        odt_sample_file: Path,
+        httpx_mock: HTTPXMock,
     ):
-        with client.libre_office.to_pdf() as route:
-            resp = route.convert(xlsx_sample_file).pdf_format(gt_format).run_with_retry()
+        httpx_mock.add_response(method="POST", headers={"Content-Type": "application/zip"})
+
+        with mocked_client.libre_office.to_pdf() as route:
+            resp = route.convert_files([docx_sample_file, odt_sample_file]).no_merge().run()
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
-
-        output = tmp_path / "test_libre_office_convert_xlsx_format_pdfa.pdf"
-        resp.to_file(output)
-        with pikepdf.open(output) as pdf:
-            meta = pdf.open_metadata()
-            assert meta.pdfa_status == pike_format
+        assert_content_type(resp, "application/zip")
+        assert isinstance(resp, ZipFileResponse)
+
+    def test_libre_office_convert_bytes(
+        self,
+        mocked_client: GotenbergClient,
+        docx_sample_bytes: bytes,
+        httpx_mock: HTTPXMock,
+    ):
+        httpx_mock.add_response(method="POST", headers={"Content-Type": "application/pdf"})
+
+        with mocked_client.libre_office.to_pdf() as route:
+            resp = route.convert_bytes(docx_sample_bytes, name="sample.docx", mime_type=DOCX_MIME_TYPE).run()
+
+        assert isinstance(resp, SingleFileResponse)
+        request = httpx_mock.get_request()
+        assert b'filename="sample.docx"' in request.content
+        assert f"Content-Type: {DOCX_MIME_TYPE}".encode() in request.content
@@ -2,40 +2,38 @@
 #
 # SPDX-License-Identifier: MPL-2.0
 from pathlib import Path
+from typing import Optional
 
-import pikepdf
 import pytest
 from httpx import codes
+from pytest_httpx import HTTPXMock
 
 from gotenberg_client import GotenbergClient
+from gotenberg_client import SingleFileResponse
 from gotenberg_client.options import PdfAFormat
+from tests.utils import assert_content_type
+from tests.utils import convert_concurrently
+from tests.utils import link_or_copy
+from tests.utils import parse_form_fields
+from tests.utils import pdfa_status
 
 
+@pytest.mark.xdist_group("pdf_a")
 class TestPdfAConvert:
-    @pytest.mark.parametrize(
-        ("gt_format", "pike_format"),
-        [(PdfAFormat.A2b, "2B"), (PdfAFormat.A3b, "3B")],
-    )
-    def test_pdf_a_single_file(
-        self,
-        client: GotenbergClient,
-        pdf_sample_one_file: Path,
-        tmp_path: Path,
-        gt_format: PdfAFormat,
-        pike_format: str,
-    ):
-        with client.pdf_a.to_pdfa() as route:
-            resp = route.convert(pdf_sample_one_file).pdf_format(gt_format).run_with_retry()
+    def test_pdf_a_single_file(self, client: GotenbergClient, pdf_sample_one_file: Path):
+        formats = {PdfAFormat.A2b: "2B", PdfAFormat.A3b: "3B"}
 
-        assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        def _convert(gt_format: PdfAFormat) -> SingleFileResponse:
+            with client.pdf_a.to_pdfa() as route:
+                return route.convert(pdf_sample_one_file).pdf_format(gt_format).run_with_retry()
 
-        output = tmp_path / "test_libre_office_convert_xlsx_format_pdfa.pdf"
-        resp.to_file(output)
-        with pikepdf.open(output) as pdf:
-            meta = pdf.open_metadata()
-            assert meta.pdfa_status == pike_format
+        responses = convert_concurrently(_convert, formats)
+
+        for resp, pike_format in zip(responses, formats.values()):
+            assert resp.status_code == codes.OK
+            assert_content_type(resp, "application/pdf")
+
+            assert pdfa_status(resp.content) == pike_format
 
     @pytest.mark.parametrize("gt_format", [PdfAFormat.A2b, PdfAFormat.A3b])
     def test_pdf_a_multiple_file(
@@ -46,41 +44,51 @@ class TestPdfAConvert:
         gt_format: PdfAFormat,
     ):
         other_test_file = tmp_path / "sample2.pdf"
-        other_test_file.write_bytes(pdf_sample_one_file.read_bytes())
+        link_or_copy(pdf_sample_one_file, other_test_file)
         with client.pdf_a.to_pdfa() as route:
             resp = route.convert_files([pdf_sample_one_file, other_test_file]).pdf_format(gt_format).run_with_retry()
 
             assert resp.status_code == codes.OK
-            assert "Content-Type" in resp.headers
-            assert resp.headers["Content-Type"] == "application/zip"
+            assert_content_type(resp, "application/zip")
 
-    def test_pdf_universal_access_enable(
+    def test_pdf_universal_access(
         self,
         client: GotenbergClient,
         pdf_sample_one_file: Path,
     ):
+        # Which value is sent for each setting is covered by the mocked test
         with client.pdf_a.to_pdfa() as route:
-            resp = (
-                route.convert(pdf_sample_one_file).pdf_format(PdfAFormat.A2b).enable_universal_access().run_with_retry()
-            )
+            route.convert(pdf_sample_one_file).pdf_format(PdfAFormat.A2b).enable_universal_access()
+            resp = route.run_with_retry()
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        assert_content_type(resp, "application/pdf")
 
-    def test_pdf_universal_access_disable(
+
+class TestPdfAConvertMocked:
+    @pytest.mark.parametrize("universal_access", [True, False, None])
+    def test_pdf_universal_access(
         self,
-        client: GotenbergClient,
+        mocked_client: GotenbergClient,
         pdf_sample_one_file: Path,
+        httpx_mock: HTTPXMock,
+        *,
+        universal_access: Optional[bool],
     ):
-        with client.pdf_a.to_pdfa() as route:
-            resp = (
-                route.convert(pdf_sample_one_file)
-                .pdf_format(PdfAFormat.A2b)
-                .disable_universal_access()
-                .run_with_retry()
-            )
+        httpx_mock.add_response(method="POST", headers={"Content-Type": "application/pdf"})
 
-        assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        with mocked_client.pdf_a.to_pdfa() as route:
+            route.convert(pdf_sample_one_file).pdf_format(PdfAFormat.A2b)
+            if universal_access is True:
+                route.enable_universal_access()
+            elif universal_access is False:
+                route.disable_universal_access()
+            resp = route.run()
+
+        assert_content_type(resp, "application/pdf")
+
+        form_fields = parse_form_fields(httpx_mock.get_request())
+        if universal_access is None:
+            assert "pdfua" not in form_fields
+        else:
+            assert form_fields["pdfua"] == str(universal_access).lower()
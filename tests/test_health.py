@@ -14,6 +14,6 @@ class TestHealthStatus:
         assert status.overall == StatusOptions.Up
         assert status.chromium is not None
         assert status.chromium.status == StatusOptions.Up
-        if "uno" in status.data:  # pragma: no cover
-            assert status.uno is not None
-            assert status.uno.status == StatusOptions.Up
+        uno = status.uno
+        if uno is not None:  # pragma: no cover
+            assert uno.status == StatusOptions.Up
@@ -1,18 +1,20 @@
 # SPDX-FileCopyrightText: 2023-present Trenton H <rda0128ou@mozmail.com>
 #
 # SPDX-License-Identifier: MPL-2.0
-import shutil
 from pathlib import Path
 
-import pikepdf
 import pytest
 from httpx import codes
 
 from gotenberg_client import GotenbergClient
 from gotenberg_client.options import PdfAFormat
+from tests.utils import PDFTOTEXT
+from tests.utils import assert_content_type
 from tests.utils import extract_text
+from tests.utils import pdfa_status
 
 
+@pytest.mark.xdist_group("merge")
 class TestMergePdfs:
     @pytest.mark.parametrize(
         ("gt_format", "pike_format"),
@@ -21,47 +23,38 @@ class TestMergePdfs:
     def test_merge_files_pdf_a(
         self,
         client: GotenbergClient,
-        sample_directory: Path,
-        tmp_path: Path,
+        merge_sample_files: list[Path],
         gt_format: PdfAFormat,
         pike_format: str,
     ):
         with client.merge.merge() as route:
             resp = (
-                route.merge([sample_directory / "z_first_merge.pdf", sample_directory / "a_merge_second.pdf"])
+                route.merge(merge_sample_files)
                 .pdf_format(
                     gt_format,
                 )
                 .run_with_retry()
             )
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        assert_content_type(resp, "application/pdf")
 
-        output = tmp_path / "test_merge_files_pdf_a.pdf"
-        resp.to_file(output)
-        with pikepdf.open(output) as pdf:
-            meta = pdf.open_metadata()
-            assert meta.pdfa_status == pike_format
+        assert pdfa_status(resp.content) == pike_format
 
     def test_merge_multiple_file(
         self,
         client: GotenbergClient,
-        sample_directory: Path,
+        merge_sample_files: list[Path],
         tmp_path: Path,
     ):
-        if shutil.which("pdftotext") is None:  # pragma: no cover
+        if PDFTOTEXT is None:  # pragma: no cover
             pytest.skip("No pdftotext executable found")
         else:
             with client.merge.merge() as route:
                 # By default, these would not merge correctly, as it happens alphabetically
-                resp = route.merge(
-                    [sample_directory / "z_first_merge.pdf", sample_directory / "a_merge_second.pdf"],
-                ).run_with_retry()
+                resp = route.merge(merge_sample_files).run_with_retry()
 
                 assert resp.status_code == codes.OK
-                assert "Content-Type" in resp.headers
-                assert resp.headers["Content-Type"] == "application/pdf"
+                assert_content_type(resp, "application/pdf")
 
                 out_file = tmp_path / "test.pdf"
                 resp.to_file(out_file)
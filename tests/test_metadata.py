@@ -1,93 +1,89 @@
+import json
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
-from pathlib import Path
 
-import pikepdf
 import pytest
 from httpx import codes
+from pytest_httpx import HTTPXMock
 
 from gotenberg_client import GotenbergClient
 from gotenberg_client import InvalidKeywordError
 from gotenberg_client import InvalidPdfRevisionError
 from gotenberg_client._convert.common import MetadataMixin
 from gotenberg_client.options import TrappedStatus
-
-
+from tests.utils import assert_content_type
+from tests.utils import assert_docinfo
+from tests.utils import parse_form_fields
+from tests.utils import pdf_from_response
+
+# The metadata test_metadata_basic sets which can be read back, and the document information expected from it
+BASIC_AUTHOR = "Gotenberg Test"
+BASIC_CREATOR = "Gotenberg Some Version"
+BASIC_KEYWORDS = ["Test", "Something"]
+BASIC_PRODUCER = "Gotenberg Client"
+BASIC_SUBJECT = "A Test File"
+BASIC_TITLE = "An override title"
+EXPECTED_BASIC_DOCINFO = {
+    "/Author": BASIC_AUTHOR,
+    "/Creator": BASIC_CREATOR,
+    "/Keywords": ", ".join(BASIC_KEYWORDS),
+    "/Producer": BASIC_PRODUCER,
+    "/Subject": BASIC_SUBJECT,
+    "/Title": BASIC_TITLE,
+    "/Trapped": "/True",
+}
+
+
+@pytest.mark.xdist_group("metadata")
 class TestPdfMetadata:
     def test_metadata_basic(
         self,
         client: GotenbergClient,
-        tmp_path: Path,
         webserver_docker_internal_url: str,
     ):
         """Test basic metadata setting."""
 
-        author = "Gotenberg Test"
         copyright_info = "Copyright Me at Me, Inc"
         creation_date = datetime(2006, 9, 18, 16, 27, 50, tzinfo=timezone(timedelta(hours=-4)))
-        creator = "Gotenberg Some Version"
-        keywords = ["Test", "Something"]
         marked = True
         mod_date = datetime(2006, 9, 18, 16, 27, 50, tzinfo=timezone(timedelta(hours=-5)))
         pdf_version = 1.5
-        producer = "Gotenberg Client"
-        subject = "A Test File"
-        title = "An override title"
         trapped = TrappedStatus.TRUE
 
         with client.chromium.url_to_pdf() as route:
             resp = (
                 route.url(webserver_docker_internal_url)
                 .metadata(
-                    author=author,
+                    author=BASIC_AUTHOR,
                     pdf_copyright=copyright_info,
                     creation_date=creation_date,
-                    creator=creator,
-                    keywords=keywords,
+                    creator=BASIC_CREATOR,
+                    keywords=BASIC_KEYWORDS,
                     marked=marked,
                     modification_date=mod_date,
                     pdf_version=pdf_version,
-                    producer=producer,
-                    subject=subject,
-                    title=title,
+                    producer=BASIC_PRODUCER,
+                    subject=BASIC_SUBJECT,
+                    title=BASIC_TITLE,
                     trapped=trapped,
                 )
                 .run_with_retry()
             )
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
-
-        output = tmp_path / "test_metadata_basic.pdf"
-        resp.to_file(output)
-
-        with pikepdf.Pdf.open(output) as pdf:
-            assert "/Author" in pdf.docinfo
-            assert pdf.docinfo["/Author"] == author
-
-            assert "/Creator" in pdf.docinfo
-            assert pdf.docinfo["/Creator"] == creator
-
-            assert "/Keywords" in pdf.docinfo
-            assert pdf.docinfo["/Keywords"] == ", ".join(keywords)
-
-            assert "/Producer" in pdf.docinfo
-            assert pdf.docinfo["/Producer"] == producer
+        assert_content_type(resp, "application/pdf")
 
-            assert "/Subject" in pdf.docinfo
-            assert pdf.docinfo["/Subject"] == subject
-
-            assert "/Title" in pdf.docinfo
-            assert pdf.docinfo["/Title"] == title
-
-            assert "/Trapped" in pdf.docinfo
-            assert pdf.docinfo["/Trapped"] == "/True"
+        with pdf_from_response(resp) as pdf:
+            assert_docinfo(pdf, EXPECTED_BASIC_DOCINFO)
 
             # TODO(stumpylog): Investigate why certain fields seems to not be possible to set
 
-    def test_metadata_trapped_bool(self, client: GotenbergClient, tmp_path: Path, webserver_docker_internal_url: str):
+    def test_metadata_trapped_bool(
+        self,
+        client: GotenbergClient,
+        webserver_docker_internal_url: str,
+    ):
         with client.chromium.url_to_pdf() as route:
             resp = (
                 route.url(webserver_docker_internal_url)
@@ -98,20 +94,14 @@ class TestPdfMetadata:
             )
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        assert_content_type(resp, "application/pdf")
 
-        output = tmp_path / "test_metadata_trapped_bool.pdf"
-        resp.to_file(output)
-
-        with pikepdf.Pdf.open(output) as pdf:
-            assert "/Trapped" in pdf.docinfo
-            assert pdf.docinfo["/Trapped"] == "/True"
+        with pdf_from_response(resp) as pdf:
+            assert_docinfo(pdf, {"/Trapped": "/True"})
 
     def test_metadata_merging(
         self,
         client: GotenbergClient,
-        tmp_path: Path,
         webserver_docker_internal_url: str,
     ):
         inital_title = "Initial Title"
@@ -130,18 +120,10 @@ class TestPdfMetadata:
             )
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
-
-        output = tmp_path / "test_metadata_merging.pdf"
-        resp.to_file(output)
+        assert_content_type(resp, "application/pdf")
 
-        with pikepdf.Pdf.open(output) as pdf:
-            assert "/Title" in pdf.docinfo
-            assert pdf.docinfo["/Title"] == new_title
-
-            assert "/Trapped" in pdf.docinfo
-            assert pdf.docinfo["/Trapped"] == "/Unknown"
+        with pdf_from_response(resp) as pdf:
+            assert_docinfo(pdf, {"/Title": new_title, "/Trapped": "/Unknown"})
 
     @pytest.mark.parametrize(
         ("base_value", "delta"),
@@ -149,18 +131,18 @@ class TestPdfMetadata:
     )
     def test_metadata_invalid_pdf_revision(
         self,
-        client: GotenbergClient,
+        mocked_client: GotenbergClient,
         webserver_docker_internal_url: str,
         base_value: float,
         delta: float,
     ):
-        with client.chromium.url_to_pdf() as route, pytest.raises(InvalidPdfRevisionError):
+        with mocked_client.chromium.url_to_pdf() as route, pytest.raises(InvalidPdfRevisionError):
             _ = (
                 route.url(webserver_docker_internal_url)
                 .metadata(
                     pdf_version=base_value + delta,
                 )
-                .run_with_retry()
+                .run()
             )
 
     @pytest.mark.parametrize(
@@ -169,15 +151,42 @@ class TestPdfMetadata:
     )
     def test_metadata_invalid_pdf_keyword(
         self,
-        client: GotenbergClient,
+        mocked_client: GotenbergClient,
         webserver_docker_internal_url: str,
         keywords: list[str],
     ):
-        with client.chromium.url_to_pdf() as route, pytest.raises(InvalidKeywordError):
+        with mocked_client.chromium.url_to_pdf() as route, pytest.raises(InvalidKeywordError):
             _ = (
                 route.url(webserver_docker_internal_url)
                 .metadata(
                     keywords=keywords,
                 )
-                .run_with_retry()
+                .run()
             )
+
+
+class TestPdfMetadataMocked:
+    def test_metadata_chaining(
+        self,
+        mocked_client: GotenbergClient,
+        webserver_docker_internal_url: str,
+        httpx_mock: HTTPXMock,
+    ):
+        httpx_mock.add_response(method="POST", headers={"Content-Type": "application/pdf"})
+
+        with mocked_client.chromium.url_to_pdf() as route:
+            _ = (
+                route.url(webserver_docker_internal_url)
+                .metadata(title="Initial Title", trapped=True)
+                .metadata(author="Gotenberg Test")
+                .metadata()
+                .metadata(title="An New Title")
+                .run()
+            )
+
+        form_fields = parse_form_fields(httpx_mock.get_request())
+        assert json.loads(form_fields["metadata"]) == {
+            "Title": "An New Title",
+            "Trapped": "True",
+            "Author": "Gotenberg Test",
+        }
@@ -1,11 +1,14 @@
 # SPDX-FileCopyrightText: 2023-present Trenton H <rda0128ou@mozmail.com>
 #
 # SPDX-License-Identifier: MPL-2.0
-import shutil
 import uuid
+import zipfile
+from io import BytesIO
 from json import dumps
 from json import loads
 from pathlib import Path
+from unittest.mock import call
+from unittest.mock import patch
 
 import pytest
 from httpx import HTTPStatusError
@@ -17,18 +20,30 @@ from gotenberg_client import CannotExtractHereError
 from gotenberg_client import GotenbergClient
 from gotenberg_client import MaxRetriesExceededError
 from gotenberg_client import ZipFileResponse
+from tests.utils import assert_content_type
+from tests.utils import link_or_copy
 
+# One response per attempt of the default run_with_retry, the last of which is raised
+SERVER_ERROR_STATUSES = (
+    codes.INTERNAL_SERVER_ERROR,
+    codes.SERVICE_UNAVAILABLE,
+    codes.GATEWAY_TIMEOUT,
+    codes.BAD_GATEWAY,
+    codes.SERVICE_UNAVAILABLE,
+)
 
+
+@pytest.mark.xdist_group("misc")
 class TestMiscFunctionality:
     def test_trace_id_header(
         self,
         client: GotenbergClient,
-        sample_directory: Path,
+        merge_sample_files: list[Path],
     ):
         trace_id = str(uuid.uuid4())
         with client.merge.merge() as route:
             resp = (
-                route.merge([sample_directory / "z_first_merge.pdf", sample_directory / "a_merge_second.pdf"])
+                route.merge(merge_sample_files)
                 .trace(
                     trace_id,
                 )
@@ -36,20 +51,19 @@ class TestMiscFunctionality:
             )
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        assert_content_type(resp, "application/pdf")
         assert "Gotenberg-Trace" in resp.headers
         assert resp.headers["Gotenberg-Trace"] == trace_id
 
     def test_output_filename(
         self,
         client: GotenbergClient,
-        sample_directory: Path,
+        merge_sample_files: list[Path],
     ):
         filename = "my-cool-file"
         with client.merge.merge() as route:
             resp = (
-                route.merge([sample_directory / "z_first_merge.pdf", sample_directory / "a_merge_second.pdf"])
+                route.merge(merge_sample_files)
                 .output_name(
                     filename,
                 )
@@ -57,8 +71,7 @@ class TestMiscFunctionality:
             )
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        assert_content_type(resp, "application/pdf")
         assert "Content-Disposition" in resp.headers
         assert f"{filename}.pdf" in resp.headers["Content-Disposition"]
 
@@ -68,17 +81,14 @@ class TestMiscFunctionality:
         non-ASCII characters.  This replicates such a thing against 1 endpoint to
         verify the workaround inside this library
         """
-        copy = shutil.copy(
-            odt_sample_file,
-            tmp_path / "Карточка партнера Тауберг Альфа.odt",  # noqa: RUF001
-        )
+        copy = tmp_path / "Карточка партнера Тауберг Альфа.odt"  # noqa: RUF001
+        link_or_copy(odt_sample_file, copy)
 
         with client.libre_office.to_pdf() as route:
             resp = route.convert(copy).run_with_retry()
 
         assert resp.status_code == codes.OK
-        assert "Content-Type" in resp.headers
-        assert resp.headers["Content-Type"] == "application/pdf"
+        assert_content_type(resp, "application/pdf")
 
     def test_extract_to_not_existing(self) -> None:
         resp = ZipFileResponse(200, {}, b"")
@@ -90,87 +100,196 @@ class TestMiscFunctionality:
         with pytest.raises(CannotExtractHereError):
             resp.extract_to(output)
 
+    def test_extract_to(self, tmp_path: Path) -> None:
+        content = BytesIO()
+        with zipfile.ZipFile(content, mode="w") as zip_file:
+            zip_file.writestr("one.pdf", b"%PDF-1.4")
+            zip_file.writestr("two.pdf", b"%PDF-1.4")
+        resp = ZipFileResponse(200, {}, content.getvalue())
+
+        resp.extract_to(tmp_path)
+
+        assert sorted(x.name for x in tmp_path.iterdir()) == ["one.pdf", "two.pdf"]
+
 
 class TestServerErrorRetry:
-    def test_server_error_retry(self, client: GotenbergClient, basic_html_file: Path, httpx_mock: HTTPXMock):
-        # Response 1
-        httpx_mock.add_response(method="POST", status_code=codes.INTERNAL_SERVER_ERROR)
-        # Response 2
-        httpx_mock.add_response(method="POST", status_code=codes.SERVICE_UNAVAILABLE)
-        # Response 3
-        httpx_mock.add_response(method="POST", status_code=codes.GATEWAY_TIMEOUT)
-        # Response 4
-        httpx_mock.add_response(method="POST", status_code=codes.BAD_GATEWAY)
-        # Response 5
-        httpx_mock.add_response(method="POST", status_code=codes.SERVICE_UNAVAILABLE)
-
-        with client.chromium.html_to_pdf() as route:
+    def test_server_error_retry(self, mocked_client: GotenbergClient, basic_html_file: Path, httpx_mock: HTTPXMock):
+        for status_code in SERVER_ERROR_STATUSES:
+            httpx_mock.add_response(method="POST", status_code=status_code)
+
+        # The default backoff schedule is verified without actually waiting through it
+        with patch("gotenberg_client._base.sleep") as mocked_sleep, mocked_client.chromium.html_to_pdf() as route:
             with pytest.raises(MaxRetriesExceededError) as exc_info:
-                _ = route.index(basic_html_file).run_with_retry(initial_retry_wait=0.1, retry_scale=0.1)
-            assert exc_info.value.response.status_code == codes.SERVICE_UNAVAILABLE
+                _ = route.index(basic_html_file).run_with_retry()
+            assert exc_info.value.response.status_code == SERVER_ERROR_STATUSES[-1]
 
-    def test_not_a_server_error(self, client: GotenbergClient, basic_html_file: Path, httpx_mock: HTTPXMock):
-        # Response 1
-        httpx_mock.add_response(method="POST", status_code=codes.NOT_FOUND)
+        assert mocked_sleep.call_args_list == [call(5.0), call(10.0), call(20.0), call(40.0)]
 
-        with client.chromium.html_to_pdf() as route:
-            with pytest.raises(HTTPStatusError) as exc_info:
-                _ = route.index(basic_html_file).run_with_retry(initial_retry_wait=0.1, retry_scale=0.1)
-            assert exc_info.value.response.status_code == codes.NOT_FOUND
+    def test_server_error_retry_max_wait_and_jitter(
+        self,
+        mocked_client: GotenbergClient,
+        basic_html_file: Path,
+        httpx_mock: HTTPXMock,
+    ):
+        for status_code in SERVER_ERROR_STATUSES:
+            httpx_mock.add_response(method="POST", status_code=status_code)
 
+        midpoint = patch("gotenberg_client._base.uniform", side_effect=lambda low, high: (low + high) / 2)
+        no_sleep = patch("gotenberg_client._base.sleep")
+        with midpoint as mocked_uniform, no_sleep as mocked_sleep, mocked_client.chromium.html_to_pdf() as route:
+            with pytest.raises(MaxRetriesExceededError) as exc_info:
+                _ = route.index(basic_html_file).run_with_retry(max_retry_wait=15, jitter=True)
+            assert exc_info.value.response.status_code == SERVER_ERROR_STATUSES[-1]
 
-class TestWebhookHeaders:
-    def test_webhook_basic_headers(self, client: GotenbergClient, basic_html_file: Path, httpx_mock: HTTPXMock):
+        # Each wait is capped at 15s before the jitter picks a duration up to it
+        assert mocked_uniform.call_args_list == [call(0, 5.0), call(0, 10.0), call(0, 15), call(0, 15)]
+        assert mocked_sleep.call_args_list == [call(2.5), call(5.0), call(7.5), call(7.5)]
+
+    def test_server_error_retry_after(
+        self,
+        mocked_client: GotenbergClient,
+        basic_html_file: Path,
+        httpx_mock: HTTPXMock,
+    ):
+        httpx_mock.add_response(method="POST", status_code=codes.SERVICE_UNAVAILABLE, headers={"Retry-After": "0.5"})
         httpx_mock.add_response(method="POST", status_code=codes.OK)
 
-        client.add_webhook_url("http://myapi:3000/on-success")
-        client.add_error_webhook_url("http://myapi:3000/on-error")
+        with patch("gotenberg_client._base.sleep") as mocked_sleep, mocked_client.chromium.html_to_pdf() as route:
+            resp = route.index(basic_html_file).run_with_retry(initial_retry_wait=60)
 
-        with client.chromium.html_to_pdf() as route:
-            _ = route.index(basic_html_file).run_with_retry()
+        assert resp.status_code == codes.OK
+        mocked_sleep.assert_called_once_with(0.5)
 
-        requests = httpx_mock.get_requests()
+    def test_server_error_retry_after_capped(
+        self,
+        mocked_client: GotenbergClient,
+        basic_html_file: Path,
+        httpx_mock: HTTPXMock,
+    ):
+        httpx_mock.add_response(method="POST", status_code=codes.SERVICE_UNAVAILABLE, headers={"Retry-After": "86400"})
+        httpx_mock.add_response(method="POST", status_code=codes.OK)
 
-        assert len(requests) == 1
+        with patch("gotenberg_client._base.sleep") as mocked_sleep, mocked_client.chromium.html_to_pdf() as route:
+            resp = route.index(basic_html_file).run_with_retry(max_retry_wait=30)
 
-        request: Request = requests[0]
+        assert resp.status_code == codes.OK
+        mocked_sleep.assert_called_once_with(30)
 
-        assert "Gotenberg-Webhook-Url" in request.headers
-        assert request.headers["Gotenberg-Webhook-Url"] == "http://myapi:3000/on-success"
-        assert "Gotenberg-Webhook-Error-Url" in request.headers
-        assert request.headers["Gotenberg-Webhook-Error-Url"] == "http://myapi:3000/on-error"
+    def test_server_error_retry_after_default_cap(
+        self,
+        mocked_client: GotenbergClient,
+        basic_html_file: Path,
+        httpx_mock: HTTPXMock,
+    ):
+        httpx_mock.add_response(method="POST", status_code=codes.SERVICE_UNAVAILABLE, headers={"Retry-After": "86400"})
+        httpx_mock.add_response(method="POST", status_code=codes.SERVICE_UNAVAILABLE, headers={"Retry-After": "86400"})
+        httpx_mock.add_response(method="POST", status_code=codes.OK)
+
+        with patch("gotenberg_client._base.sleep") as mocked_sleep, mocked_client.chromium.html_to_pdf() as route:
+            resp = route.index(basic_html_file).run_with_retry()
 
-    def test_webhook_http_methods(self, client: GotenbergClient, basic_html_file: Path, httpx_mock: HTTPXMock):
+        # Without max_retry_wait, each wait is limited to the backoff wait
+        assert resp.status_code == codes.OK
+        assert mocked_sleep.call_args_list == [call(5.0), call(10.0)]
+
+    @pytest.mark.parametrize("retry_after", ["nan", "inf", "-inf", "1e400"])
+    def test_server_error_retry_after_not_finite(
+        self,
+        mocked_client: GotenbergClient,
+        basic_html_file: Path,
+        httpx_mock: HTTPXMock,
+        retry_after: str,
+    ):
+        httpx_mock.add_response(
+            method="POST",
+            status_code=codes.SERVICE_UNAVAILABLE,
+            headers={"Retry-After": retry_after},
+        )
         httpx_mock.add_response(method="POST", status_code=codes.OK)
 
-        client.add_webhook_url("http://myapi:3000/on-success")
-        client.set_webhook_http_method("POST")
-        client.add_error_webhook_url("http://myapi:3000/on-error")
-        client.set_error_webhook_http_method("PATCH")
+        with patch("gotenberg_client._base.sleep") as mocked_sleep, mocked_client.chromium.html_to_pdf() as route:
+            resp = route.index(basic_html_file).run_with_retry(initial_retry_wait=60)
 
-        with client.chromium.html_to_pdf() as route:
-            _ = route.index(basic_html_file).run_with_retry()
+        # The header is ignored, falling back to the backoff wait
+        assert resp.status_code == codes.OK
+        mocked_sleep.assert_called_once_with(60)
 
-        requests = httpx_mock.get_requests()
+    def test_too_many_requests_retry(
+        self,
+        mocked_client: GotenbergClient,
+        basic_html_file: Path,
+        httpx_mock: HTTPXMock,
+    ):
+        httpx_mock.add_response(method="POST", status_code=codes.TOO_MANY_REQUESTS)
+        httpx_mock.add_response(method="POST", status_code=codes.OK)
 
-        assert len(requests) == 1
+        with patch("gotenberg_client._base.sleep") as mocked_sleep, mocked_client.chromium.html_to_pdf() as route:
+            resp = route.index(basic_html_file).run_with_retry()
 
-        request: Request = requests[0]
+        assert resp.status_code == codes.OK
+        mocked_sleep.assert_called_once_with(5)
+
+    def test_too_many_requests_retry_after_default_cap(
+        self,
+        mocked_client: GotenbergClient,
+        basic_html_file: Path,
+        httpx_mock: HTTPXMock,
+    ):
+        # A rate limiting proxy asking for an hour does not block a caller who set no max_retry_wait
+        httpx_mock.add_response(method="POST", status_code=codes.TOO_MANY_REQUESTS, headers={"Retry-After": "3600"})
+        httpx_mock.add_response(method="POST", status_code=codes.OK)
+
+        with patch("gotenberg_client._base.sleep") as mocked_sleep, mocked_client.chromium.html_to_pdf() as route:
+            resp = route.index(basic_html_file).run_with_retry()
+
+        assert resp.status_code == codes.OK
+        mocked_sleep.assert_called_once_with(5)
 
-        assert "Gotenberg-Webhook-Method" in request.headers
-        assert request.headers["Gotenberg-Webhook-Method"] == "POST"
-        assert "Gotenberg-Webhook-Error-Method" in request.headers
-        assert request.headers["Gotenberg-Webhook-Error-Method"] == "PATCH"
+    def test_too_many_requests_retry_after_capped(
+        self,
+        mocked_client: GotenbergClient,
+        basic_html_file: Path,
+        httpx_mock: HTTPXMock,
+    ):
+        # Rate limiting proxies can ask for long waits, which max_retry_wait bounds
+        httpx_mock.add_response(method="POST", status_code=codes.TOO_MANY_REQUESTS, headers={"Retry-After": "3600"})
+        httpx_mock.add_response(method="POST", status_code=codes.OK)
+
+        with patch("gotenberg_client._base.sleep") as mocked_sleep, mocked_client.chromium.html_to_pdf() as route:
+            resp = route.index(basic_html_file).run_with_retry(max_retry_wait=10)
+
+        assert resp.status_code == codes.OK
+        mocked_sleep.assert_called_once_with(10)
+
+    def test_not_a_server_error(self, mocked_client: GotenbergClient, basic_html_file: Path, httpx_mock: HTTPXMock):
+        # Response 1
+        httpx_mock.add_response(method="POST", status_code=codes.NOT_FOUND)
 
-    def test_webhook_extra_headers(self, client: GotenbergClient, basic_html_file: Path, httpx_mock: HTTPXMock):
+        with patch("gotenberg_client._base.sleep") as mocked_sleep, mocked_client.chromium.html_to_pdf() as route:
+            with pytest.raises(HTTPStatusError) as exc_info:
+                _ = route.index(basic_html_file).run_with_retry()
+            assert exc_info.value.response.status_code == codes.NOT_FOUND
+
+        mocked_sleep.assert_not_called()
+
+
+class TestWebhookHeaders:
+    def test_webhook_all_headers(self, mocked_client: GotenbergClient, basic_html_file: Path, httpx_mock: HTTPXMock):
+        """
+        Every webhook setting is sent as its own header, so they are all configured and
+        verified against a single conversion request
+        """
         httpx_mock.add_response(method="POST", status_code=codes.OK)
 
         headers = {"Token": "mytokenvalue"}
-        headers_str = dumps(headers)
 
-        client.set_webhook_extra_headers(headers)
+        mocked_client.add_webhook_url("http://myapi:3000/on-success")
+        mocked_client.set_webhook_http_method("POST")
+        mocked_client.add_error_webhook_url("http://myapi:3000/on-error")
+        mocked_client.set_error_webhook_http_method("PATCH")
+        mocked_client.set_webhook_extra_headers(headers)
 
-        with client.chromium.html_to_pdf() as route:
+        with mocked_client.chromium.html_to_pdf() as route:
             _ = route.index(basic_html_file).run_with_retry()
 
         requests = httpx_mock.get_requests()
@@ -179,6 +298,13 @@ class TestWebhookHeaders:
 
         request: Request = requests[0]
 
-        assert "Gotenberg-Webhook-Extra-Http-Headers" in request.headers
-        assert request.headers["Gotenberg-Webhook-Extra-Http-Headers"] == headers_str
+        for header, expected in (
+            ("Gotenberg-Webhook-Url", "http://myapi:3000/on-success"),
+            ("Gotenberg-Webhook-Error-Url", "http://myapi:3000/on-error"),
+            ("Gotenberg-Webhook-Method", "POST"),
+            ("Gotenberg-Webhook-Error-Method", "PATCH"),
+            ("Gotenberg-Webhook-Extra-Http-Headers", dumps(headers)),
+        ):
+            assert header in request.headers
+            assert request.headers[header] == expected
         assert loads(request.headers["Gotenberg-Webhook-Extra-Http-Headers"]) == headers
@@ -1,44 +1,136 @@
 # SPDX-FileCopyrightText: 2023-present Trenton H <rda0128ou@mozmail.com>
 #
 # SPDX-License-Identifier: MPL-2.0
+import os
+import re
 import shutil
 import subprocess
-import tempfile
-from pathlib import Path
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import TypeVar
+from typing import Union
 
+import pikepdf
 
-def verify_stream_contains(request, key: str, value: str) -> None:
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+# Limits concurrent conversions so the Gotenberg container is not overloaded
+MAX_CONCURRENT_CONVERSIONS = 4
+
+_FIELD_NAME_RE = re.compile(rb'Content-Disposition: form-data; name="([^"]*)"', re.IGNORECASE)
+# Resolved once, instead of searching PATH for every extraction
+PDFTOTEXT = shutil.which("pdftotext")
+# Quiet, layout preserving, UTF-8 text
+_PDFTOTEXT_OPTIONS = ("-q", "-layout", "-enc", "UTF-8")
+
+
+def assert_content_type(response, content_type: str) -> None:
+    """
+    Verifies the response has the given Content-Type, with a single header lookup
+    """
+    assert response.headers.get("Content-Type") == content_type
+
+
+def convert_concurrently(convert: Callable[[_T], _R], items: Iterable[_T]) -> list[_R]:
+    """
+    Runs the given conversion for each item concurrently, sharing the session client's
+    connections, with only a few requests in flight.  Returns the results in the order
+    of the items
+    """
+    items = list(items)
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_CONCURRENT_CONVERSIONS, len(items)))) as executor:
+        return list(executor.map(convert, items))
+
+
+def link_or_copy(source: Union[str, os.PathLike[str]], destination: Union[str, os.PathLike[str]]) -> None:
+    """
+    Gives the source file a second name, hard linking it where possible instead of copying its contents
+    """
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def parse_form_fields(request) -> dict[str, str]:
+    """
+    Parses the multipart body of the request once, returning the value of each
+    non-file form field by its name
+    """
     content_type = request.headers["Content-Type"]
     assert "multipart/form-data" in content_type
 
     boundary = content_type.split("boundary=")[1]
 
-    parts = request.content.split(f"--{boundary}".encode())
-
-    form_field_found = any(f'name="{key}"'.encode() in part and value.encode() in part for part in parts)
-    assert form_field_found, f'Key "{key}" with value "{value}" not found in stream'
-
-
-def extract_text(pdf_path: Path) -> str:
-    """
-    Using pdftotext from poppler, extracts the text of a PDF into a file,
-    then reads the file contents and returns it
-    """
-    pdf_to_text = shutil.which("pdftotext")
-    assert pdf_to_text is not None
-    with tempfile.NamedTemporaryFile(
-        mode="w+",
-    ) as tmp:
-        subprocess.run(
-            [
-                pdf_to_text,
-                "-q",
-                "-layout",
-                "-enc",
-                "UTF-8",
-                str(pdf_path),
-                tmp.name,
-            ],
-            check=True,
-        )
-        return tmp.read()
+    fields: dict[str, str] = {}
+    for part in request.content.split(f"--{boundary}".encode()):
+        headers, separator, body = part.partition(b"\r\n\r\n")
+        if not separator:
+            continue
+        disposition = _FIELD_NAME_RE.search(headers)
+        if disposition is None or b"filename=" in headers:
+            continue
+        fields[disposition.group(1).decode()] = body.removesuffix(b"\r\n").decode()
+    return fields
+
+
+def verify_stream_contains(request, key: str, value: str) -> None:
+    verify_stream_contains_all(request, {key: value})
+
+
+def verify_stream_contains_all(request, fields: Mapping[str, str]) -> None:
+    """
+    Verifies each of the given field names was sent with the given value,
+    parsing the multipart body only once for all of them
+    """
+    form_fields = parse_form_fields(request)
+
+    for key, value in fields.items():
+        assert form_fields.get(key) == value, f'Key "{key}" with value "{value}" not found in stream'
+
+
+def assert_docinfo(pdf, expected: Mapping[str, str]) -> None:
+    """
+    Verifies each of the given document information keys, such as "/Author", is
+    present in the pikepdf Pdf with the given value
+    """
+    docinfo = pdf.docinfo
+    for key, value in expected.items():
+        assert key in docinfo, f'Key "{key}" not found in document information'
+        assert docinfo[key] == value, f'Key "{key}" does not have value "{value}"'
+
+
+def pdf_from_response(response) -> pikepdf.Pdf:
+    """
+    Opens the PDF content of a response in pikepdf from memory, without writing it to disk.
+    Use the returned Pdf as a context manager so it is closed
+    """
+    return pikepdf.open(BytesIO(response.content), inherit_page_attributes=False)
+
+
+def pdfa_status(content: bytes) -> str:
+    """
+    Returns the PDF/A part and conformance of the PDF, such as "2B", read from its
+    XMP metadata by pikepdf.  Only the metadata is read, so no docinfo is updated
+    """
+    with pikepdf.open(BytesIO(content)) as pdf:
+        return pdf.open_metadata(set_pikepdf_as_editor=False, update_docinfo=False).pdfa_status
+
+
+def extract_text(pdf_path: Union[str, os.PathLike[str]]) -> str:
+    """
+    Using pdftotext from poppler, extracts the text of a PDF, writing it to
+    stdout instead of a file, and returns it
+    """
+    assert PDFTOTEXT is not None
+    return subprocess.run(
+        [PDFTOTEXT, *_PDFTOTEXT_OPTIONS, os.fspath(pdf_path), "-"],
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        encoding="utf-8",
+    ).stdout